@@ -0,0 +1,45 @@
+"""
+Small on-disk cache for Helius responses
+Values are stored as orjson blobs in SQLite, keyed by string with a write timestamp
+"""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import orjson
+
+CACHE_PATH = Path(os.getenv("SCANNER_CACHE_PATH", ".cache/scanner.sqlite"))
+
+_conn: Optional[sqlite3.Connection] = None
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the cache database on first use"""
+    global _conn
+    if _conn is None:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, isolation_level=None)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("CREATE TABLE IF NOT EXISTS cache (k TEXT PRIMARY KEY, v BLOB, ts REAL)")
+    return _conn
+
+
+def get(key: str, max_age: Optional[float] = None) -> Optional[Any]:
+    """Return cached value for key, or None if missing or older than max_age seconds"""
+    row = _connect().execute("SELECT v, ts FROM cache WHERE k = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    if max_age is not None and time.time() - row[1] > max_age:
+        return None
+    return orjson.loads(row[0])
+
+
+def set(key: str, value: Any) -> None:
+    """Store value under key with the current timestamp"""
+    _connect().execute(
+        "INSERT OR REPLACE INTO cache (k, v, ts) VALUES (?, ?, ?)",
+        (key, orjson.dumps(value), time.time())
+    )
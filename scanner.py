@@ -4,13 +4,20 @@ Pump.fun Token Scanner - Analyzes recent token launches for investment opportuni
 Uses Helius API to fetch and score tokens based on holder count, age, dev holdings, and liquidity
 """
 
+import asyncio
+import heapq
 import httpx
-import json
+import ijson
+import numpy as np
+import orjson
+from aiolimiter import AsyncLimiter
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterable, AsyncIterator, Set
 from pathlib import Path
 import time
 
+import cache
+
 # Configuration
 import os
 HELIUS_API_KEY = os.getenv("HELIUS_API_KEY")
@@ -43,9 +50,39 @@ THRESHOLDS = {
     "min_liquidity": 1000
 }
 
+# Cache lifetimes in seconds (None never expires)
+CACHE_TTL = {
+    "supply": None,
+    "largest_accounts": 60,
+    "metadata": 600
+}
+
+# HTTP settings
+MAX_CONCURRENT_REQUESTS = 10
+REQUESTS_PER_SECOND = 10  # Helius rate limit
+RPC_BATCH_SIZE = 20  # Calls per JSON-RPC batch request
+MAX_MULTIPLE_ACCOUNTS = 100  # getMultipleAccounts limit per call
+DAS_PAGE_SIZE = 1000  # DAS API maximum page size
+
+# Shared async client so all requests reuse one connection pool
+# HTTP/2 multiplexes concurrent requests to Helius over kept-alive connections (needs httpx[http2])
+_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+)
+_REQUEST_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+# Token bucket: bursts go out immediately, sustained traffic stays under the rate limit
+_RATE_LIMITER = AsyncLimiter(REQUESTS_PER_SECOND, 1)
+
+
+def _json(response: httpx.Response) -> Any:
+    """Decode a JSON response body with orjson, straight from the raw bytes"""
+    return orjson.loads(response.content)
+
 
-def fetch_recent_transactions(limit: int = 100) -> List[Dict[str, Any]]:
-    """Fetch recent transactions from pump.fun program using parsed transactions"""
+async def stream_recent_transactions(limit: int = 100) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Stream recent transactions from pump.fun program, yielding them in batches as they are parsed"""
     url = f"{BASE_URL}/addresses/{PUMP_FUN_PROGRAM}/transactions"
     params = {
         "api-key": HELIUS_API_KEY
@@ -53,249 +90,368 @@ def fetch_recent_transactions(limit: int = 100) -> List[Dict[str, Any]]:
     
     print(f"Fetching recent transactions from pump.fun program...")
     
+    # Incremental parser: each chunk off the wire fills `transactions` with completed items
+    transactions = ijson.sendable_list()
+    parser = ijson.items_coro(transactions, "item", use_float=True)
+    count = 0
+    
     try:
-        with httpx.Client(timeout=60.0) as client:
-            response = client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            print(f"Retrieved {len(data) if isinstance(data, list) else 0} transactions")
-            return data if isinstance(data, list) else []
+        async with _REQUEST_SEMAPHORE, _RATE_LIMITER:
+            async with _CLIENT.stream("GET", url, params=params, timeout=60.0) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    parser.send(chunk)
+                    if transactions:
+                        count += len(transactions)
+                        yield list(transactions)
+                        del transactions[:]
+        
+        parser.close()
+        if transactions:
+            count += len(transactions)
+            yield list(transactions)
+        print(f"Retrieved {count} transactions")
     except Exception as e:
         print(f"Error fetching transactions: {e}")
-        return []
 
 
-def search_assets_by_creator(creator: str = PUMP_FUN_PROGRAM, limit: int = 50) -> List[str]:
-    """Search for assets created by pump.fun program using DAS API"""
+async def fetch_assets_page(creator: str, page: int, page_size: int) -> List[str]:
+    """Fetch one page of assets created by creator from the DAS API"""
     url = f"{BASE_URL}/assets"
     params = {"api-key": HELIUS_API_KEY}
     
     payload = {
         "creatorAddress": creator,
-        "limit": limit,
-        "page": 1
+        "limit": page_size,
+        "page": page
     }
     
-    print(f"Searching for pump.fun assets using DAS API...")
-    
     try:
-        with httpx.Client(timeout=60.0) as client:
-            response = client.post(url, params=params, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            
-            items = data.get("items", [])
-            mints = [item.get("id") for item in items if item.get("id")]
-            
-            print(f"Found {len(mints)} assets from pump.fun")
-            return mints
+        async with _REQUEST_SEMAPHORE, _RATE_LIMITER:
+            response = await _CLIENT.post(url, params=params, json=payload, timeout=60.0)
+        response.raise_for_status()
+        data = _json(response)
+        
+        items = data.get("items", [])
+        return [item.get("id") for item in items if item.get("id")]
     except Exception as e:
-        print(f"Error searching assets: {e}")
+        print(f"Error searching assets (page {page}): {e}")
         return []
 
 
-def extract_token_mints(transactions: List[Dict[str, Any]]) -> List[str]:
+async def search_assets_by_creator(creator: str = PUMP_FUN_PROGRAM, limit: int = 50) -> List[str]:
+    """Search for assets created by pump.fun program using DAS API"""
+    print(f"Searching for pump.fun assets using DAS API...")
+    
+    # Request every page needed for `limit` at once rather than walking them in turn
+    page_size = min(limit, DAS_PAGE_SIZE)
+    page_count = (limit + page_size - 1) // page_size if page_size > 0 else 0
+    pages = await asyncio.gather(
+        *(fetch_assets_page(creator, page, page_size) for page in range(1, page_count + 1))
+    )
+    
+    # Flatten and de-duplicate, keeping page order
+    mints = list(dict.fromkeys(mint for page in pages for mint in page))[:limit]
+    
+    print(f"Found {len(mints)} assets from pump.fun")
+    return mints
+
+
+def extract_token_mints(transactions: Iterable[Dict[str, Any]]) -> Set[str]:
     """Extract unique token mint addresses from transactions"""
-    mints = set()
-    
-    for tx in transactions:
-        # Look for token balances changes indicating new token creation
-        if "tokenTransfers" in tx:
-            for transfer in tx.get("tokenTransfers", []):
-                if "mint" in transfer:
-                    mints.add(transfer["mint"])
-        
-        # Also check native transfers
-        if "nativeTransfers" in tx:
-            for transfer in tx.get("nativeTransfers", []):
-                if "mint" in transfer:
-                    mints.add(transfer["mint"])
-                    
-        # Check accountData for mints
-        if "accountData" in tx:
-            for account in tx.get("accountData", []):
-                if isinstance(account, dict) and "mint" in account:
-                    mints.add(account["mint"])
-    
-    mints_list = list(mints)
-    print(f"Found {len(mints_list)} unique token mints")
-    return mints_list
-
-
-def fetch_token_metadata_batch(mints: List[str]) -> Dict[str, Dict[str, Any]]:
+    # Token transfers, native transfers and accountData entries can all carry a mint
+    # Helius always returns these entries as objects, so a key probe is enough
+    return {
+        entry["mint"]
+        for tx in transactions
+        for key in ("tokenTransfers", "nativeTransfers", "accountData")
+        for entry in tx.get(key) or ()
+        if "mint" in entry
+    }
+
+
+async def fetch_token_metadata_batch(mints: List[str]) -> Dict[str, Dict[str, Any]]:
     """Fetch metadata for multiple tokens"""
     if not mints:
         return {}
+    
+    # Serve what we can from cache and only request the rest
+    metadata_map = {}
+    misses = []
+    for mint in mints:
+        cached = cache.get(f"metadata:{mint}", CACHE_TTL["metadata"])
+        if cached is not None:
+            metadata_map[mint] = cached
+        else:
+            misses.append(mint)
+    
+    if not misses:
+        print(f"Metadata for {len(mints)} tokens served from cache")
+        return metadata_map
         
     url = f"{BASE_URL}/token-metadata"
     params = {"api-key": HELIUS_API_KEY}
     
-    print(f"Fetching metadata for {len(mints)} tokens...")
+    print(f"Fetching metadata for {len(misses)} tokens ({len(metadata_map)} cached)...")
     
     try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(url, params=params, json={"mintAccounts": mints})
-            response.raise_for_status()
-            data = response.json()
-            
-            # Map by mint address
-            metadata_map = {}
-            if isinstance(data, list):
-                for item in data:
-                    if isinstance(item, dict) and "account" in item:
-                        metadata_map[item["account"]] = item
-            
-            print(f"Retrieved metadata for {len(metadata_map)} tokens")
-            return metadata_map
+        async with _REQUEST_SEMAPHORE, _RATE_LIMITER:
+            response = await _CLIENT.post(url, params=params, json={"mintAccounts": misses})
+        response.raise_for_status()
+        data = _json(response)
+        
+        # Map by mint address
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict) and "account" in item:
+                    metadata_map[item["account"]] = item
+                    cache.set(f"metadata:{item['account']}", item)
+        
+        print(f"Retrieved metadata for {len(metadata_map)} tokens")
+        return metadata_map
     except Exception as e:
         print(f"Error fetching metadata: {e}")
-        return {}
+        return metadata_map
 
 
-def get_token_supply(mint: str) -> Optional[Dict[str, Any]]:
-    """Get token supply using RPC"""
+async def _send_rpc_batch(calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+    """Send one JSON-RPC batch request, results in call order"""
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    
+    results: List[Any] = [None] * len(calls)
     try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(
-                RPC_URL,
-                json={
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "getTokenSupply",
-                    "params": [mint]
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-            result = data.get("result")
-            if result:
-                return result.get("value", {})
-            return {}
+        async with _REQUEST_SEMAPHORE, _RATE_LIMITER:
+            response = await _CLIENT.post(RPC_URL, json=payload)
+        response.raise_for_status()
+        data = _json(response)
+        
+        # Responses may come back in any order, match them up by id
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict) and isinstance(item.get("id"), int) and 0 <= item["id"] < len(calls):
+                    results[item["id"]] = item.get("result")
     except Exception as e:
-        return {}
+        print(f"Error sending RPC batch: {e}")
+    
+    return results
 
 
-def get_token_largest_accounts(mint: str) -> List[Dict[str, Any]]:
-    """Get largest token holders using RPC"""
-    try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(
-                RPC_URL,
-                json={
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "getTokenLargestAccounts",
-                    "params": [mint]
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-            result = data.get("result")
-            if result and isinstance(result, dict):
-                return result.get("value", [])
-            return []
-    except Exception as e:
+async def rpc_batch(calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+    """Send RPC calls as concurrent JSON-RPC batches, results in call order"""
+    if not calls:
         return []
+    
+    chunks = [calls[i:i + RPC_BATCH_SIZE] for i in range(0, len(calls), RPC_BATCH_SIZE)]
+    print(f"Sending {len(calls)} RPC calls in {len(chunks)} batches...")
+    
+    chunk_results = await asyncio.gather(*(_send_rpc_batch(chunk) for chunk in chunks))
+    return [result for results in chunk_results for result in results]
 
 
-def calculate_holder_score(holder_count: int) -> float:
-    """Score based on holder count (0-100)"""
-    if holder_count >= THRESHOLDS["excellent_holders"]:
-        return 100.0
-    elif holder_count >= THRESHOLDS["good_holders"]:
-        return 70.0 + (holder_count - THRESHOLDS["good_holders"]) / (THRESHOLDS["excellent_holders"] - THRESHOLDS["good_holders"]) * 30.0
-    elif holder_count >= THRESHOLDS["min_holders"]:
-        return 40.0 + (holder_count - THRESHOLDS["min_holders"]) / (THRESHOLDS["good_holders"] - THRESHOLDS["min_holders"]) * 30.0
+def parse_mint_account(account: Any) -> Optional[Dict[str, Any]]:
+    """Pull supply and decimals out of a jsonParsed mint account"""
+    try:
+        info = account["data"]["parsed"]["info"]
+        return {"amount": info["supply"], "decimals": info["decimals"]}
+    except (KeyError, TypeError):
+        return None
+
+
+async def fetch_onchain_data(mints: List[str]) -> Dict[str, Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Get (supply, largest accounts) per mint, using the cache and one RPC pass for misses"""
+    supply_map: Dict[str, Dict[str, Any]] = {}
+    largest_map: Dict[str, List[Dict[str, Any]]] = {}
+    supply_misses = []
+    largest_misses = []
+    
+    for mint in mints:
+        supply_info = cache.get(f"supply:{mint}", CACHE_TTL["supply"])
+        if supply_info is not None:
+            supply_map[mint] = supply_info
+        else:
+            supply_misses.append(mint)
+        
+        largest_accounts = cache.get(f"largest_accounts:{mint}", CACHE_TTL["largest_accounts"])
+        if largest_accounts is not None:
+            largest_map[mint] = largest_accounts
+        else:
+            largest_misses.append(mint)
+    
+    # Supply comes from the parsed mint accounts, up to MAX_MULTIPLE_ACCOUNTS per call
+    supply_chunks = [
+        supply_misses[i:i + MAX_MULTIPLE_ACCOUNTS]
+        for i in range(0, len(supply_misses), MAX_MULTIPLE_ACCOUNTS)
+    ]
+    calls = [("getMultipleAccounts", [chunk, {"encoding": "jsonParsed"}]) for chunk in supply_chunks]
+    calls += [("getTokenLargestAccounts", [mint]) for mint in largest_misses]
+    
+    if not calls:
+        print(f"On-chain data for {len(mints)} tokens served from cache")
     else:
-        return (holder_count / THRESHOLDS["min_holders"]) * 40.0
+        results = await rpc_batch(calls)
+        
+        for chunk, result in zip(supply_chunks, results):
+            accounts = result.get("value") if isinstance(result, dict) else None
+            if not isinstance(accounts, list):
+                continue
+            for mint, account in zip(chunk, accounts):
+                supply_info = parse_mint_account(account)
+                if supply_info is not None:
+                    supply_map[mint] = supply_info
+                    cache.set(f"supply:{mint}", supply_info)
+        
+        for mint, result in zip(largest_misses, results[len(supply_chunks):]):
+            if isinstance(result, dict) and isinstance(result.get("value"), list):
+                largest_map[mint] = result["value"]
+                cache.set(f"largest_accounts:{mint}", result["value"])
+    
+    return {mint: (supply_map.get(mint, {}), largest_map.get(mint, [])) for mint in mints}
+
+
+# Scoring constants, resolved from THRESHOLDS once at import
+_EXCELLENT_H = float(THRESHOLDS["excellent_holders"])
+_GOOD_H = float(THRESHOLDS["good_holders"])
+_MIN_H = float(THRESHOLDS["min_holders"])
+_HR_HIGH = 30.0 / (_EXCELLENT_H - _GOOD_H)
+_HR_MID = 30.0 / (_GOOD_H - _MIN_H)
+_HR_LOW = 40.0 / _MIN_H
+
+_AGE_MIN = float(THRESHOLDS["sweet_spot_age_min"])
+_AGE_MAX = float(THRESHOLDS["sweet_spot_age_max"])
+_AR_YOUNG = 100.0 / _AGE_MIN
+_AR_DECAY = 20.0 / 24.0  # Points lost per hour past the sweet spot
+
+_DEV_RED = float(THRESHOLDS["dev_red_flag"])
+_DEV_WARN = float(THRESHOLDS["dev_warning"])
+_DR_HIGH = 50.0 / (_DEV_RED - _DEV_WARN)
+_DR_LOW = 50.0 / _DEV_WARN
+
+_GREAT_L = float(THRESHOLDS["great_liquidity"])
+_GOOD_L = float(THRESHOLDS["good_liquidity"])
+_MIN_L = float(THRESHOLDS["min_liquidity"])
+_LR_HIGH = 30.0 / (_GREAT_L - _GOOD_L)
+_LR_MID = 30.0 / (_GOOD_L - _MIN_L)
+_LR_LOW = 40.0 / _MIN_L
+
+_W_HOLDERS = WEIGHTS["holders"]
+_W_AGE = WEIGHTS["age"]
+_W_DEV = WEIGHTS["dev_holdings"]
+_W_LIQUIDITY = WEIGHTS["liquidity"]
+
+
+def calculate_dev_holdings(supplies: np.ndarray, largest_amounts: np.ndarray) -> np.ndarray:
+    """Largest holder's share of supply as a percentage, 0 where supply is unknown"""
+    # One reciprocal per mint, then a multiply, instead of dividing every amount
+    inv_supply = np.divide(1.0, supplies, out=np.zeros_like(supplies), where=supplies > 0)
+    return largest_amounts * inv_supply * 100.0
+
+
+def calculate_holder_score(holder_count: np.ndarray) -> np.ndarray:
+    """Score based on holder count (0-100)"""
+    return np.select(
+        [holder_count >= _EXCELLENT_H, holder_count >= _GOOD_H, holder_count >= _MIN_H],
+        [100.0, 70.0 + (holder_count - _GOOD_H) * _HR_HIGH, 40.0 + (holder_count - _MIN_H) * _HR_MID],
+        default=holder_count * _HR_LOW
+    )
 
 
-def calculate_age_score(age_hours: float) -> float:
+def calculate_age_score(age_hours: np.ndarray) -> np.ndarray:
     """Score based on token age (0-100), sweet spot is 24-72 hours"""
-    if THRESHOLDS["sweet_spot_age_min"] <= age_hours <= THRESHOLDS["sweet_spot_age_max"]:
-        return 100.0
-    elif age_hours < THRESHOLDS["sweet_spot_age_min"]:
-        return (age_hours / THRESHOLDS["sweet_spot_age_min"]) * 100.0
-    else:
-        excess = age_hours - THRESHOLDS["sweet_spot_age_max"]
-        decay = max(0, 100.0 - (excess / 24) * 20)
-        return decay
+    return np.select(
+        [age_hours < _AGE_MIN, age_hours <= _AGE_MAX],
+        [age_hours * _AR_YOUNG, 100.0],
+        default=np.maximum(0.0, 100.0 - (age_hours - _AGE_MAX) * _AR_DECAY)
+    )
 
 
-def calculate_dev_holdings_score(dev_percentage: float) -> float:
+def calculate_dev_holdings_score(dev_percentage: np.ndarray) -> np.ndarray:
     """Score based on dev holdings (0-100), lower is better"""
-    if dev_percentage >= THRESHOLDS["dev_red_flag"]:
-        return 0.0
-    elif dev_percentage >= THRESHOLDS["dev_warning"]:
-        return 50.0 - ((dev_percentage - THRESHOLDS["dev_warning"]) / (THRESHOLDS["dev_red_flag"] - THRESHOLDS["dev_warning"])) * 50.0
-    else:
-        return 100.0 - (dev_percentage / THRESHOLDS["dev_warning"]) * 50.0
+    return np.select(
+        [dev_percentage >= _DEV_RED, dev_percentage >= _DEV_WARN],
+        [0.0, 50.0 - (dev_percentage - _DEV_WARN) * _DR_HIGH],
+        default=100.0 - dev_percentage * _DR_LOW
+    )
 
 
-def calculate_liquidity_score(liquidity: float) -> float:
+def calculate_liquidity_score(liquidity: np.ndarray) -> np.ndarray:
     """Score based on liquidity (0-100)"""
-    if liquidity >= THRESHOLDS["great_liquidity"]:
-        return 100.0
-    elif liquidity >= THRESHOLDS["good_liquidity"]:
-        return 70.0 + (liquidity - THRESHOLDS["good_liquidity"]) / (THRESHOLDS["great_liquidity"] - THRESHOLDS["good_liquidity"]) * 30.0
-    elif liquidity >= THRESHOLDS["min_liquidity"]:
-        return 40.0 + (liquidity - THRESHOLDS["min_liquidity"]) / (THRESHOLDS["good_liquidity"] - THRESHOLDS["min_liquidity"]) * 30.0
+    return np.select(
+        [liquidity >= _GREAT_L, liquidity >= _GOOD_L, liquidity >= _MIN_L],
+        [100.0, 70.0 + (liquidity - _GOOD_L) * _LR_HIGH, 40.0 + (liquidity - _MIN_L) * _LR_MID],
+        default=liquidity * _LR_LOW
+    )
+
+
+def score_all(
+    holders: np.ndarray,
+    ages: np.ndarray,
+    devs: np.ndarray,
+    liquidities: np.ndarray
+) -> np.ndarray:
+    """Weighted total score (0-100) for every token in one vectorized pass"""
+    return (
+        calculate_holder_score(holders) * _W_HOLDERS +
+        calculate_age_score(ages) * _W_AGE +
+        calculate_dev_holdings_score(devs) * _W_DEV +
+        calculate_liquidity_score(liquidities) * _W_LIQUIDITY
+    )
+
+
+def get_risk_level(score: float) -> str:
+    """Map a total score to a risk level"""
+    if score >= 75:
+        return "low"
+    elif score >= 50:
+        return "medium"
     else:
-        return (liquidity / THRESHOLDS["min_liquidity"]) * 40.0
+        return "high"
 
 
-def analyze_token(mint: str, metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Analyze a single token and return scored data"""
-    print(f"Analyzing token: {mint[:8]}...")
-    
-    if not metadata or not isinstance(metadata, dict):
+def _extract_name_symbol(metadata: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Get (name, symbol) from Helius token metadata, None if either is missing"""
+    # Helius returns a stable schema, so take the happy path and treat any gap as missing
+    try:
+        token_info = metadata["onChainMetadata"]["metadata"]["data"]
+        name = token_info["name"].strip() or "Unknown"
+        symbol = token_info["symbol"].strip() or "???"
+    except (KeyError, TypeError, AttributeError):
         return None
     
-    # Extract basic info with safe navigation
-    on_chain = metadata.get("onChainMetadata")
-    if not on_chain or not isinstance(on_chain, dict):
-        on_chain = {}
-    
-    metadata_obj = on_chain.get("metadata")
-    if not metadata_obj or not isinstance(metadata_obj, dict):
-        metadata_obj = {}
-    
-    token_info = metadata_obj.get("data")
-    if not token_info or not isinstance(token_info, dict):
-        token_info = {}
-    
-    name = str(token_info.get("name", "Unknown")).strip() if token_info.get("name") else "Unknown"
-    symbol = str(token_info.get("symbol", "???")).strip() if token_info.get("symbol") else "???"
-    
     # Skip if no valid name/symbol
-    if name == "Unknown" or not symbol or symbol == "???":
+    if name == "Unknown" or symbol == "???":
         return None
+    return name, symbol
+
+
+def analyze_token(
+    mint: str,
+    metadata: Dict[str, Any],
+    largest_accounts: Optional[List[Dict[str, Any]]],
+    dev_holdings: float,
+    now: float
+) -> Optional[Dict[str, Any]]:
+    """Analyze a single token and return its metrics and flags, scored later in bulk"""
+    print(f"Analyzing token: {mint[:8]}...")
     
-    # Get token supply
-    supply_info = get_token_supply(mint)
-    total_supply = 0
-    decimals = 9
-    if supply_info and isinstance(supply_info, dict):
-        total_supply = int(supply_info.get("amount", 0))
-        decimals = int(supply_info.get("decimals", 9))
+    token_names = _extract_name_symbol(metadata)
+    if token_names is None:
+        return None
+    name, symbol = token_names
+    on_chain = metadata["onChainMetadata"]
     
-    # Get largest holders
-    largest_accounts = get_token_largest_accounts(mint)
+    # Largest holders
     holder_count = len(largest_accounts) if largest_accounts else 0
     
-    # Calculate dev holdings (largest holder percentage)
-    dev_holdings = 0.0
-    if largest_accounts and total_supply > 0:
-        largest_amount = int(largest_accounts[0].get("amount", 0))
-        dev_holdings = (largest_amount / total_supply) * 100
-    
     # Estimate age from metadata update time
     age_hours = 48.0  # Default estimate
     if "updatedAt" in on_chain:
         try:
             update_timestamp = on_chain["updatedAt"]
             if isinstance(update_timestamp, (int, float)):
-                age_hours = (time.time() - update_timestamp) / 3600
+                age_hours = (now - update_timestamp) / 3600
         except:
             pass
     
@@ -303,28 +459,6 @@ def analyze_token(mint: str, metadata: Dict[str, Any]) -> Optional[Dict[str, Any
     # In production, you'd query DEX pool data
     liquidity = holder_count * 150  # Rough estimate
     
-    # Calculate component scores
-    holder_score = calculate_holder_score(holder_count)
-    age_score = calculate_age_score(age_hours)
-    dev_score = calculate_dev_holdings_score(dev_holdings)
-    liquidity_score = calculate_liquidity_score(liquidity)
-    
-    # Calculate weighted total score
-    total_score = (
-        holder_score * WEIGHTS["holders"] +
-        age_score * WEIGHTS["age"] +
-        dev_score * WEIGHTS["dev_holdings"] +
-        liquidity_score * WEIGHTS["liquidity"]
-    )
-    
-    # Determine risk level
-    if total_score >= 75:
-        risk_level = "low"
-    elif total_score >= 50:
-        risk_level = "medium"
-    else:
-        risk_level = "high"
-    
     # Generate flags
     flags = []
     
@@ -358,61 +492,100 @@ def analyze_token(mint: str, metadata: Dict[str, Any]) -> Optional[Dict[str, Any
         "address": mint,
         "name": name,
         "symbol": symbol,
-        "score": round(total_score, 2),
-        "risk_level": risk_level,
+        "score": 0.0,  # Filled in by score_all across all tokens
+        "risk_level": "",
         "holders": holder_count,
-        "age_hours": round(age_hours, 2),
-        "dev_holdings": round(dev_holdings, 2),
-        "liquidity": round(liquidity, 2),
+        "age_hours": age_hours,
+        "dev_holdings": dev_holdings,
+        "liquidity": liquidity,
         "flags": flags
     }
 
 
-def scan_tokens(max_tokens: int = 20) -> Dict[str, Any]:
+async def scan_tokens_async(max_tokens: int = 20) -> Dict[str, Any]:
     """Main scanning function"""
     print(f"\n{'='*60}")
     print("PUMP.FUN TOKEN SCANNER")
     print(f"{'='*60}\n")
     
+    # One clock reading per scan keeps token ages consistent with the timestamp
+    now = time.time()
+    scanned_at = datetime.fromtimestamp(now, timezone.utc).isoformat()
+    
     # Try DAS API first for finding pump.fun tokens
-    mints = search_assets_by_creator(PUMP_FUN_PROGRAM, limit=max_tokens)
+    mints = await search_assets_by_creator(PUMP_FUN_PROGRAM, limit=max_tokens)
     
     # Fallback to transaction parsing if DAS fails
     if not mints:
         print("DAS search failed, falling back to transaction parsing...")
-        transactions = fetch_recent_transactions(limit=100)
-        if not transactions:
+        # Pull mints out of each batch as it arrives instead of holding every transaction
+        tx_count = 0
+        found_mints: Set[str] = set()
+        async for transactions in stream_recent_transactions(limit=100):
+            tx_count += len(transactions)
+            found_mints.update(extract_token_mints(transactions))
+        if not tx_count:
             print("No transactions found")
-            return create_empty_result()
+            return create_empty_result(scanned_at)
         
-        mints = extract_token_mints(transactions)
+        mints = list(found_mints)
+        print(f"Found {len(mints)} unique token mints")
         if not mints:
             print("No token mints found")
-            return create_empty_result()
+            return create_empty_result(scanned_at)
     
     # Limit number of tokens to analyze
     mints = mints[:max_tokens]
     
-    # Fetch metadata in batch
-    metadata_map = fetch_token_metadata_batch(mints)
+    # Fetch metadata alongside supply and largest holders for every mint
+    metadata_map, onchain_map = await asyncio.gather(
+        fetch_token_metadata_batch(mints),
+        fetch_onchain_data(mints)
+    )
+    
+    # Dev holdings (largest holder percentage) for every mint at once
+    supplies = np.array(
+        [float(onchain_map[mint][0].get("amount", 0)) for mint in mints],
+        dtype=np.float64
+    )
+    largest_amounts = np.array(
+        [float(onchain_map[mint][1][0].get("amount", 0)) if onchain_map[mint][1] else 0.0 for mint in mints],
+        dtype=np.float64
+    )
+    dev_holdings = calculate_dev_holdings(supplies, largest_amounts).tolist()
     
     # Analyze tokens
     analyzed_tokens = []
-    for mint in mints:
+    for mint, dev_percentage in zip(mints, dev_holdings):
         metadata = metadata_map.get(mint, {})
-        token_data = analyze_token(mint, metadata)
+        largest_accounts = onchain_map[mint][1]
+        token_data = analyze_token(mint, metadata, largest_accounts, dev_percentage, now)
         if token_data:
             analyzed_tokens.append(token_data)
-        time.sleep(0.1)  # Rate limiting
     
-    # Sort by score
-    analyzed_tokens.sort(key=lambda t: t["score"], reverse=True)
+    # Score every token at once
+    if analyzed_tokens:
+        scores = score_all(
+            np.array([t["holders"] for t in analyzed_tokens], dtype=np.float64),
+            np.array([t["age_hours"] for t in analyzed_tokens], dtype=np.float64),
+            np.array([t["dev_holdings"] for t in analyzed_tokens], dtype=np.float64),
+            np.array([t["liquidity"] for t in analyzed_tokens], dtype=np.float64)
+        )
+        for token, score in zip(analyzed_tokens, scores.tolist()):
+            token["score"] = score
+            token["risk_level"] = get_risk_level(score)
     
     # Calculate stats
     total_scanned = len(analyzed_tokens)
-    opportunities = len([t for t in analyzed_tokens if t["score"] >= 70])
-    avg_score = sum(t["score"] for t in analyzed_tokens) / total_scanned if total_scanned > 0 else 0
-    total_liquidity = sum(t["liquidity"] for t in analyzed_tokens)
+    opportunities = 0
+    score_sum = 0
+    total_liquidity = 0
+    for token in analyzed_tokens:
+        score = token["score"]
+        score_sum += score
+        total_liquidity += token["liquidity"]
+        opportunities += score >= 70
+    avg_score = score_sum / total_scanned if total_scanned > 0 else 0
     
     print(f"\n{'='*60}")
     print("SCAN COMPLETE")
@@ -424,7 +597,7 @@ def scan_tokens(max_tokens: int = 20) -> Dict[str, Any]:
     print(f"{'='*60}\n")
     
     return {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": scanned_at,
         "stats": {
             "total_scanned": total_scanned,
             "opportunities": opportunities,
@@ -435,10 +608,10 @@ def scan_tokens(max_tokens: int = 20) -> Dict[str, Any]:
     }
 
 
-def create_empty_result() -> Dict[str, Any]:
+def create_empty_result(timestamp: str) -> Dict[str, Any]:
     """Create empty result structure"""
     return {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": timestamp,
         "stats": {
             "total_scanned": 0,
             "opportunities": 0,
@@ -449,28 +622,38 @@ def create_empty_result() -> Dict[str, Any]:
     }
 
 
+async def run_scan(max_tokens: int = 20) -> Dict[str, Any]:
+    """Run a scan and release the shared HTTP client afterwards"""
+    try:
+        return await scan_tokens_async(max_tokens=max_tokens)
+    finally:
+        await _CLIENT.aclose()
+
+
 def main():
     """Main entry point"""
     # Run scan
-    results = scan_tokens(max_tokens=20)
+    results = asyncio.run(run_scan(max_tokens=20))
     
     # Ensure data directory exists
     output_dir = Path("data")
     output_dir.mkdir(exist_ok=True)
     
-    # Write results
+    # Write results to a temp file and swap it in so readers never see a partial file
     output_file = output_dir / "tokens.json"
-    with open(output_file, "w") as f:
-        json.dump(results, f, indent=2)
+    tmp_file = output_file.with_suffix(".json.tmp")
+    tmp_file.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_file, output_file)
     
     print(f"Results written to: {output_file}")
     
     # Print top opportunities
     if results["tokens"]:
         print("\nTOP OPPORTUNITIES:\n")
-        for i, token in enumerate(results["tokens"][:5], 1):
+        top_tokens = heapq.nlargest(5, results["tokens"], key=lambda t: t["score"])
+        for i, token in enumerate(top_tokens, 1):
             print(f"{i}. {token['name']} ({token['symbol']})")
-            print(f"   Score: {token['score']}/100 | Risk: {token['risk_level'].upper()}")
+            print(f"   Score: {token['score']:.2f}/100 | Risk: {token['risk_level'].upper()}")
             print(f"   Holders: {token['holders']} | Age: {token['age_hours']:.1f}h")
             print(f"   Dev Holdings: {token['dev_holdings']:.1f}% | Liquidity: ${token['liquidity']:,.2f}")
             print(f"   Address: {token['address']}")